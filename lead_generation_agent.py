@@ -1,30 +1,133 @@
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+import copy
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import json
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import sqlite3
 import os
+import re
+import string
 import requests
-from twilio.rest import Client
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+import onnxruntime as ort
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Number of leads the CLI buffers before writing them in one transaction
+CLI_LEAD_BUFFER_SIZE = 10
+
+# SQL for the per-lead hot paths; sqlite3 caches the prepared statement per SQL text
+_SQL_INSERT_LEAD = "INSERT INTO leads (id, name, email, company, phone, created_at) VALUES (?, ?, ?, ?, ?, ?)"
+_SQL_LEAD_EXISTS = "SELECT 1 FROM leads WHERE id = ? LIMIT 1"
+_SQL_SELECT_LEAD_CONTACT = "SELECT name, email, company FROM leads WHERE id = ?"
+_SQL_SELECT_LEAD_PHONE = "SELECT phone FROM leads WHERE id = ?"
+_SQL_SELECT_LEAD_QUALIFICATION = "SELECT qualification FROM leads WHERE id = ?"
+_SQL_UPDATE_QUALIFICATION = "UPDATE leads SET qualification = ? WHERE id = ?"
+_SQL_UPDATE_SCORE = "UPDATE leads SET score = ? WHERE id = ?"
+_SQL_INSERT_CONTACT_ATTEMPT = "INSERT INTO contact_attempts (lead_id, timestamp, channel, result) VALUES (?, ?, ?, ?)"
+
+# Every scalar in the detailed report, computed in one statement. The score
+# aggregates are separate subqueries so MIN/MAX become seeks on idx_leads_score
+# and AVG scans that index instead of whole lead rows
+_SQL_REPORT_SUMMARY = '''
+    SELECT
+        COUNT(*) AS total_leads,
+        COUNT(CASE WHEN qualification = 'Priority Lead' THEN 1 END) AS qualified_leads,
+        COUNT(CASE WHEN qualification = 'Disqualified' THEN 1 END) AS disqualified_leads,
+        (SELECT MIN(score) FROM leads) AS min_score,
+        (SELECT MAX(score) FROM leads) AS max_score,
+        (SELECT AVG(score) FROM leads) AS average_score,
+        (SELECT COUNT(*) FROM contact_attempts) AS total_contacts,
+        (SELECT COUNT(*) FROM contact_attempts WHERE result = 'success') AS successful_attempts
+    FROM leads
+'''
+
+# Lead IDs bound per IN (...) query, kept well below SQLite's 999 parameter limit
+_SQL_PARAM_CHUNK_SIZE = 500
+
+# Qualification indexed by the criteria bitmask from _criteria_mask:
+# bit 0 = budget, bit 1 = authority, bit 2 = every supplied criterion met
+_QUALIFICATION_BY_MASK = np.array([
+    "Disqualified", "Research Queue", "Disqualified", "Nurture Queue",
+    "Priority Lead", "Priority Lead", "Priority Lead", "Priority Lead"
+], dtype=object)
+
+# Industries that count towards the lead scoring model's industry feature
+HIGH_VALUE_INDUSTRIES = {'Technology', 'Finance', 'Healthcare'}
+
+# Number of columns produced by LeadGenerationAgent._featurize
+N_LEAD_FEATURES = 5
+
+# Concurrent Twilio requests issued by outbound_contact_batch
+SMS_WORKER_POOL_SIZE = 8
+
+# Placeholders send_emails fills in; templates may only reference these
+EMAIL_TEMPLATE_FIELDS = {'name', 'company'}
+
+DEFAULT_SMS_MESSAGE = "Hello! We'd like to discuss our services with you."
+
+# Process-wide sequence so IDs generated within the same nanosecond tick don't collide
+_lead_id_sequence = itertools.count()
+
+# (epoch second, ISO 8601 string) last produced by _current_timestamp
+_cached_timestamp = (None, '')
+
+@lru_cache(maxsize=4096)
+def lookup_company_size(company_name: str) -> int:
+    # In a real scenario, you would use an API or database to get this information
+    # For this example, we'll return a random number
+    return random.randint(10, 10000)
+
+@lru_cache(maxsize=4096)
+def lookup_company_industry(company_name: str) -> str:
+    # In a real scenario, you would use an API or database to get this information
+    # For this example, we'll return a random industry
+    industries = ['Technology', 'Finance', 'Healthcare', 'Education', 'Retail']
+    return random.choice(industries)
+
+def _current_timestamp() -> str:
+    # Formatted at most once per second and reused until the clock ticks over
+    global _cached_timestamp
+    second = int(time.time())
+    if _cached_timestamp[0] != second:
+        _cached_timestamp = (second, time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second)))
+    return _cached_timestamp[1]
+
+def _criteria_mask(criteria: Dict[str, bool]) -> int:
+    return bool(criteria.get("budget")) | bool(criteria.get("authority")) << 1 | all(criteria.values()) << 2
+
 class LeadGenerationAgent:
     def __init__(self, config_file: str = 'config.json'):
         self.config = self.load_config(config_file)
         self.db_conn = self.initialize_database()
         self.email_templates = self.load_email_templates()
-        self.twilio_client = Client(self.config['twilio_account_sid'], self.config['twilio_auth_token'])
+        # Built on first SMS; see the twilio_client property
+        self._twilio = None
         self.lead_scoring_model = self.train_lead_scoring_model()
+        # (db_conn.total_changes, report) from the last generate_detailed_report call
+        self._report_cache = (None, None)
+
+    @property
+    def twilio_client(self):
+        if self._twilio is None:
+            # Deferred so agents that never send SMS skip importing and building the client
+            from twilio.rest import Client
+            self._twilio = Client(self.config['twilio_account_sid'], self.config['twilio_auth_token'])
+        return self._twilio
 
     def load_config(self, config_file: str) -> Dict:
         try:
@@ -39,7 +142,15 @@ class LeadGenerationAgent:
 
     def initialize_database(self) -> sqlite3.Connection:
         try:
-            conn = sqlite3.connect(self.config['database_file'])
+            # Autocommit mode: single statements commit on their own and multi-statement
+            # writes use explicit transactions via _transaction
+            conn = sqlite3.connect(self.config['database_file'], isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")  # Read up to 256 MiB of the file through mmap
+            conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
             cursor = conn.cursor()
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS leads (
@@ -47,11 +158,15 @@ class LeadGenerationAgent:
                     name TEXT,
                     email TEXT,
                     company TEXT,
+                    phone TEXT,
                     qualification TEXT,
                     created_at TEXT,
                     score INTEGER
                 )
             ''')
+            # Databases created before the phone column existed need it added in place
+            if 'phone' not in {column['name'] for column in cursor.execute("PRAGMA table_info(leads)")}:
+                cursor.execute("ALTER TABLE leads ADD COLUMN phone TEXT")
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS contact_attempts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,7 +177,9 @@ class LeadGenerationAgent:
                     FOREIGN KEY (lead_id) REFERENCES leads (id)
                 )
             ''')
-            conn.commit()
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_qualification ON leads (qualification)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_score ON leads (score)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_contact_attempts_result ON contact_attempts (result)")
             return conn
         except sqlite3.Error as e:
             logging.error(f"Database initialization error: {str(e)}")
@@ -72,11 +189,27 @@ class LeadGenerationAgent:
         templates = {}
         template_dir = self.config['email_template_directory']
         try:
-            for filename in os.listdir(template_dir):
-                if filename.endswith('.txt'):
-                    with open(os.path.join(template_dir, filename), 'r') as f:
-                        template_name = os.path.splitext(filename)[0]
-                        templates[template_name] = f.read()
+            with os.scandir(template_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.txt') and entry.is_file():
+                        with open(entry.path, 'r') as f:
+                            template = f.read()
+                        # Check placeholders at load so a malformed template or an unknown field
+                        # fails at startup instead of raising on every send
+                        try:
+                            placeholders = {
+                                re.split(r'[.\[]', field_name, maxsplit=1)[0]
+                                for _, field_name, _, _ in string.Formatter().parse(template)
+                                if field_name is not None
+                            }
+                        except ValueError as e:
+                            logging.error(f"Invalid placeholder in email template {entry.name}: {str(e)}")
+                            raise
+                        unknown = placeholders - EMAIL_TEMPLATE_FIELDS
+                        if unknown:
+                            logging.error(f"Email template {entry.name} uses unknown placeholders: {sorted(unknown)}")
+                            raise ValueError(f"Unknown placeholders in email template {entry.name}: {sorted(unknown)}")
+                        templates[os.path.splitext(entry.name)[0]] = template
             return templates
         except FileNotFoundError:
             logging.error(f"Email template directory {template_dir} not found.")
@@ -85,87 +218,161 @@ class LeadGenerationAgent:
             logging.error(f"Error reading email templates: {str(e)}")
             raise
 
+    def _new_lead_id(self) -> str:
+        return f"LEAD_{time.time_ns():x}_{next(_lead_id_sequence):x}"
+
     def generate_lead(self, contact_info: Dict) -> str:
-        lead_id = f"LEAD_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        lead_id = self.generate_leads_bulk([contact_info])[0]
+        logging.info(f"New lead generated: {lead_id}")
+        return lead_id
+
+    def generate_leads_bulk(self, contacts: List[Dict]) -> List[str]:
+        created_at = _current_timestamp()
+        rows = [
+            (self._new_lead_id(), contact['name'], contact['email'], contact['company'], contact.get('phone'), created_at)
+            for contact in contacts
+        ]
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute(
-                "INSERT INTO leads (id, name, email, company, created_at) VALUES (?, ?, ?, ?, ?)",
-                (lead_id, contact_info['name'], contact_info['email'], contact_info['company'], datetime.now().isoformat())
-            )
-            self.db_conn.commit()
-            logging.info(f"New lead generated: {lead_id}")
-            return lead_id
+            with self._transaction():
+                self.db_conn.executemany(_SQL_INSERT_LEAD, rows)
+            logging.info(f"{len(rows)} lead(s) generated")
+            return [row[0] for row in rows]
         except sqlite3.Error as e:
-            logging.error(f"Error generating lead: {str(e)}")
-            self.db_conn.rollback()
+            logging.error(f"Error generating leads: {str(e)}")
             raise
 
+    @contextmanager
+    def _transaction(self):
+        self.db_conn.execute("BEGIN")
+        try:
+            yield
+            self.db_conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT leaves the transaction open, while a failed statement may
+            # already have been rolled back by SQLite (e.g. SQLITE_BUSY/FULL/IOERR); only
+            # roll back what is still open so the original error is never masked
+            if self.db_conn.in_transaction:
+                self.db_conn.execute("ROLLBACK")
+            raise
+
+    def _lead_exists(self, lead_id: str) -> bool:
+        return self.db_conn.execute(_SQL_LEAD_EXISTS, (lead_id,)).fetchone() is not None
+
     def outbound_contact(self, lead_id: str, channel: str) -> bool:
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
-            lead = cursor.fetchone()
+            lead = self.db_conn.execute(_SQL_SELECT_LEAD_CONTACT, (lead_id,)).fetchone()
             
             if not lead:
                 logging.error(f"Lead {lead_id} not found")
                 return False
 
             if channel == 'email':
-                success = self.send_email(lead[2], lead[1], 'initial_contact')
+                success = self.send_email(lead['email'], lead['name'], 'initial_contact', lead['company'] or '')
             elif channel == 'sms':
-                success = self.send_sms(lead_id, "Hello! We'd like to discuss our services with you.")
+                success = self.send_sms(lead_id, DEFAULT_SMS_MESSAGE)
             else:
                 logging.error(f"Invalid channel: {channel}")
                 return False
 
-            cursor.execute(
-                "INSERT INTO contact_attempts (lead_id, timestamp, channel, result) VALUES (?, ?, ?, ?)",
-                (lead_id, datetime.now().isoformat(), channel, 'success' if success else 'failure')
+            self.db_conn.execute(
+                _SQL_INSERT_CONTACT_ATTEMPT,
+                (lead_id, _current_timestamp(), channel, 'success' if success else 'failure')
             )
-            self.db_conn.commit()
             logging.info(f"Outbound contact made for lead {lead_id} via {channel}")
             return success
         except Exception as e:
             logging.error(f"Error in outbound contact: {str(e)}")
-            self.db_conn.rollback()
             return False
 
+    def outbound_contact_batch(self, lead_ids: List[str], channel: str) -> Dict[str, bool]:
+        results = {lead_id: False for lead_id in lead_ids}
+        try:
+            if channel not in ('email', 'sms'):
+                logging.error(f"Invalid channel: {channel}")
+                return results
+
+            leads = self._read_leads("id, name, email, company, phone", lead_ids)
+            # NULL columns may come back as NaN (truthy, and rendered as "nan") depending
+            # on the pandas version; normalise them to None like the single-lead path sees
+            leads = leads.astype(object).where(leads.notna(), None)
+            for lead_id in results.keys() - set(leads['id']):
+                logging.error(f"Lead {lead_id} not found")
+
+            if leads.empty:
+                return results
+
+            if channel == 'email':
+                # One SMTP session for the whole batch instead of a handshake per message
+                sent = self.send_emails(
+                    [(email, name, company or '') for email, name, company in zip(leads['email'], leads['name'], leads['company'])],
+                    'initial_contact'
+                )
+            else:
+                recipients = list(zip(leads['id'], leads['phone']))
+                try:
+                    # Build the client before fanning out so workers don't race to create it
+                    _ = self.twilio_client
+                except Exception as e:
+                    # Same outcome as send_sms: each lead gets a recorded failure attempt
+                    logging.error(f"Failed to create Twilio client: {str(e)}")
+                    sent = [False] * len(recipients)
+                else:
+                    with ThreadPoolExecutor(max_workers=SMS_WORKER_POOL_SIZE) as pool:
+                        sent = list(pool.map(lambda recipient: self._send_sms_to(*recipient, DEFAULT_SMS_MESSAGE), recipients))
+
+            results.update(zip(leads['id'], sent))
+            timestamp = _current_timestamp()
+            with self._transaction():
+                self.db_conn.executemany(
+                    _SQL_INSERT_CONTACT_ATTEMPT,
+                    [(lead_id, timestamp, channel, 'success' if success else 'failure')
+                     for lead_id, success in zip(leads['id'], sent)]
+                )
+            logging.info(f"Outbound contact made for {len(sent)} lead(s) via {channel}")
+            return results
+        except Exception as e:
+            logging.error(f"Error in batch outbound contact: {str(e)}")
+            return results
+
     def qualify_lead(self, lead_id: str, criteria: Dict[str, bool]) -> str:
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
-            lead = cursor.fetchone()
-            
-            if not lead:
+            if not self._lead_exists(lead_id):
                 logging.error(f"Lead {lead_id} not found")
                 return "Not Found"
 
-            if all(criteria.values()):
-                qualification = "Priority Lead"
-            elif criteria.get("budget") and criteria.get("authority"):
-                qualification = "Nurture Queue"
-            elif criteria.get("budget"):
-                qualification = "Research Queue"
-            else:
-                qualification = "Disqualified"
+            qualification = _QUALIFICATION_BY_MASK[_criteria_mask(criteria)]
 
-            cursor.execute("UPDATE leads SET qualification = ? WHERE id = ?", (qualification, lead_id))
-            self.db_conn.commit()
+            self.db_conn.execute(_SQL_UPDATE_QUALIFICATION, (qualification, lead_id))
             logging.info(f"Lead {lead_id} qualified as: {qualification}")
             return qualification
         except sqlite3.Error as e:
             logging.error(f"Error qualifying lead: {str(e)}")
-            self.db_conn.rollback()
+            raise
+
+    def qualify_leads(self, criteria_by_lead: Dict[str, Dict[str, bool]]) -> Dict[str, str]:
+        try:
+            found = set(self._read_leads("id", list(criteria_by_lead))['id'])
+            for lead_id in criteria_by_lead.keys() - found:
+                logging.error(f"Lead {lead_id} not found")
+
+            lead_ids = [lead_id for lead_id in criteria_by_lead if lead_id in found]
+            masks = np.fromiter((_criteria_mask(criteria_by_lead[lead_id]) for lead_id in lead_ids), dtype=np.uint8, count=len(lead_ids))
+            qualifications = _QUALIFICATION_BY_MASK[masks].tolist()
+
+            with self._transaction():
+                self.db_conn.executemany(_SQL_UPDATE_QUALIFICATION, zip(qualifications, lead_ids))
+            logging.info(f"{len(lead_ids)} lead(s) qualified")
+
+            results = {lead_id: "Not Found" for lead_id in criteria_by_lead}
+            results.update(zip(lead_ids, qualifications))
+            return results
+        except sqlite3.Error as e:
+            logging.error(f"Error qualifying leads: {str(e)}")
             raise
 
     def process_eoi(self, lead_id: str, eoi_data: Dict) -> bool:
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
-            lead = cursor.fetchone()
-            
-            if not lead:
+            if not self._lead_exists(lead_id):
                 logging.error(f"Lead {lead_id} not found")
                 return False
 
@@ -179,15 +386,13 @@ class LeadGenerationAgent:
 
     def transfer_lead(self, lead_id: str, sales_team_available: bool) -> str:
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
-            lead = cursor.fetchone()
+            lead = self.db_conn.execute(_SQL_SELECT_LEAD_QUALIFICATION, (lead_id,)).fetchone()
             
             if not lead:
                 logging.error(f"Lead {lead_id} not found")
                 return "Transfer Failed"
 
-            qualification = lead[4]  # Assuming qualification is stored in the 5th column
+            qualification = lead['qualification']
             
             if qualification == "Priority Lead" and sales_team_available:
                 transfer_status = "Live Transfer"
@@ -203,137 +408,194 @@ class LeadGenerationAgent:
             logging.error(f"Error transferring lead: {str(e)}")
             return "Transfer Failed"
 
+    def _read_leads(self, columns: str, lead_ids: List[str]) -> pd.DataFrame:
+        lead_ids = list(dict.fromkeys(lead_ids))
+        chunks = []
+        for i in range(0, len(lead_ids), _SQL_PARAM_CHUNK_SIZE):
+            chunk = lead_ids[i:i + _SQL_PARAM_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            chunks.append(pd.read_sql(
+                f"SELECT {columns} FROM leads WHERE id IN ({placeholders})",
+                self.db_conn,
+                params=chunk
+            ))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns.split(', '))
+
+    def _featurize(self, leads: pd.DataFrame) -> np.ndarray:
+        # Extract features (you may need to adjust this based on your data)
+        # Each text column becomes one contiguous unicode array; missing values count as empty
+        names = leads['name'].fillna('').to_numpy(dtype=str)
+        emails = leads['email'].fillna('').to_numpy(dtype=str)
+        companies = leads['company'].fillna('').to_numpy(dtype=str)
+
+        # Look up each distinct company once and broadcast back to its rows
+        unique_companies, company_index = np.unique(companies, return_inverse=True)
+        sizes = np.array([self.get_company_size(c) for c in unique_companies.tolist()], dtype=np.int32)
+        high_value = np.array(
+            [self.get_company_industry(c) in HIGH_VALUE_INDUSTRIES for c in unique_companies.tolist()],
+            dtype=np.int32
+        )
+
+        return np.column_stack([
+            np.char.str_len(names),  # Name length as a feature
+            np.char.str_len(emails),  # Email length as a feature
+            np.char.str_len(companies),  # Company name length as a feature
+            sizes[company_index],
+            high_value[company_index]
+        ]).astype(np.float32)  # The ONNX scoring graph takes float32 input directly
+
+    def _build_inference_session(self, model) -> ort.InferenceSession:
+        onx = convert_sklearn(
+            model,
+            initial_types=[('input', FloatTensorType([None, N_LEAD_FEATURES]))],
+            options={id(model): {'zipmap': False}}
+        )
+        return ort.InferenceSession(onx.SerializeToString(), providers=['CPUExecutionProvider'])
+
     def train_lead_scoring_model(self):
+        model = self._fit_lead_scoring_model()
+        if model is None:
+            return None
+        # Keep the sklearn model for training only; scoring runs the ONNX graph natively.
+        # Conversion is outside the training error handling on purpose: a broken
+        # skl2onnx/onnx/protobuf install must fail loudly, not masquerade as "no model"
+        return self._build_inference_session(model)
+
+    def _fit_lead_scoring_model(self) -> Optional[HistGradientBoostingClassifier]:
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads")
-            leads = cursor.fetchall()
-            
-            if not leads:
+            leads = pd.read_sql("SELECT name, email, company, qualification FROM leads", self.db_conn)
+
+            if leads.empty:
                 logging.warning("No leads available for training the model")
                 return None
 
             # Prepare data for training
-            X = []
-            y = []
-            for lead in leads:
-                # Extract features (you may need to adjust this based on your data)
-                features = [
-                    len(lead[1]),  # Name length as a feature
-                    len(lead[2]),  # Email length as a feature
-                    len(lead[3]),  # Company name length as a feature
-                    self.get_company_size(lead[3]),
-                    1 if self.get_company_industry(lead[3]) in ['Technology', 'Finance', 'Healthcare'] else 0
-                ]
-                X.append(features)
-                y.append(1 if lead[4] == "Priority Lead" else 0)  # 1 for Priority Lead, 0 otherwise
+            X = self._featurize(leads)
+            y = (leads['qualification'] == "Priority Lead").astype(np.int8).values  # 1 for Priority Lead, 0 otherwise
 
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-
-            model = RandomForestClassifier(n_estimators=100, random_state=42)
-            model.fit(X_train_scaled, y_train)
+            # Histogram-based boosting is scale-invariant, so features need no scaler
+            model = HistGradientBoostingClassifier(max_iter=100, max_depth=6, learning_rate=0.1, random_state=42)
+            model.fit(X_train, y_train)
 
-            accuracy = model.score(X_test_scaled, y_test)
+            accuracy = model.score(X_test, y_test)
             logging.info(f"Lead scoring model trained with accuracy: {accuracy}")
 
-            return (model, scaler)
+            return model
         except Exception as e:
             logging.error(f"Error training lead scoring model: {str(e)}")
             return None
 
     def score_lead(self, lead_id: str) -> int:
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
-            lead = cursor.fetchone()
-            
-            if not lead:
-                logging.error(f"Lead {lead_id} not found")
-                return 0
+        if not self._lead_exists(lead_id):
+            logging.error(f"Lead {lead_id} not found")
+            return 0
+        return self.score_leads([lead_id]).get(lead_id, 0)
 
+    def score_leads(self, lead_ids: List[str]) -> Dict[str, int]:
+        try:
             if self.lead_scoring_model is None:
                 logging.warning("Lead scoring model not available")
-                return 0
+                return {}
 
-            model, scaler = self.lead_scoring_model
+            session = self.lead_scoring_model
 
-            features = [
-                len(lead[1]),  # Name length as a feature
-                len(lead[2]),  # Email length as a feature
-                len(lead[3]),  # Company name length as a feature
-                self.get_company_size(lead[3]),
-                1 if self.get_company_industry(lead[3]) in ['Technology', 'Finance', 'Healthcare'] else 0
-            ]
+            leads = self._read_leads("id, name, email, company", lead_ids)
 
-            features_scaled = scaler.transform([features])
-            score = int(model.predict_proba(features_scaled)[0][1] * 100)  # Convert probability to a score out of 100
+            if leads.empty:
+                logging.warning("No matching leads to score")
+                return {}
 
-            cursor.execute("UPDATE leads SET score = ? WHERE id = ?", (score, lead_id))
-            self.db_conn.commit()
+            features = self._featurize(leads)
+            # Convert probabilities to scores out of 100
+            probabilities = session.run(['probabilities'], {'input': features})[0]
+            scores = (probabilities[:, 1] * 100).astype(np.int8)
 
-            return score
+            scores_by_id = dict(zip(leads['id'], scores.tolist()))
+            with self._transaction():
+                self.db_conn.executemany(_SQL_UPDATE_SCORE, [(score, lead_id) for lead_id, score in scores_by_id.items()])
+
+            return scores_by_id
         except Exception as e:
-            logging.error(f"Error scoring lead: {str(e)}")
-            return 0
+            logging.error(f"Error scoring leads: {str(e)}")
+            return {}
 
     def get_company_size(self, company_name: str) -> int:
-        # In a real scenario, you would use an API or database to get this information
-        # For this example, we'll return a random number
-        import random
-        return random.randint(10, 10000)
+        # Cached per company so training and scoring resolve each company once
+        return lookup_company_size(company_name)
 
     def get_company_industry(self, company_name: str) -> str:
-        # In a real scenario, you would use an API or database to get this information
-        # For this example, we'll return a random industry
-        import random
-        industries = ['Technology', 'Finance', 'Healthcare', 'Education', 'Retail']
-        return random.choice(industries)
+        return lookup_company_industry(company_name)
+
+    def _build_email(self, to_email: str, fields: Dict[str, str], template: str) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = self.config['email_sender']
+        msg['To'] = to_email
+        msg['Subject'] = "Regarding our services"
+
+        body = template.format_map(fields)
+        msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    def _open_smtp(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
+        server.starttls()
+        server.login(self.config['email_username'], self.config['email_password'])
+        return server
+
+    def send_email(self, to_email: str, name: str, template_name: str, company: str = '') -> bool:
+        return self.send_emails([(to_email, name, company)], template_name)[0]
+
+    def send_emails(self, recipients: List[Tuple[str, str, str]], template_name: str) -> List[bool]:
+        results = [False] * len(recipients)
+        template = self.email_templates.get(template_name)
+        if not template:
+            logging.error(f"Email template {template_name} not found")
+            return results
 
-    def send_email(self, to_email: str, name: str, template_name: str) -> bool:
         try:
-            template = self.email_templates.get(template_name)
-            if not template:
-                logging.error(f"Email template {template_name} not found")
-                return False
-
-            msg = MIMEMultipart()
-            msg['From'] = self.config['email_sender']
-            msg['To'] = to_email
-            msg['Subject'] = "Regarding our services"
-
-            body = template.format(name=name)
-            msg.attach(MIMEText(body, 'plain'))
-
-            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
-            server.starttls()
-            server.login(self.config['email_username'], self.config['email_password'])
-            server.send_message(msg)
-            server.quit()
-
-            logging.info(f"Email sent to {to_email}")
-            return True
+            server = self._open_smtp()
         except Exception as e:
             logging.error(f"Error sending email: {str(e)}")
-            return False
+            return results
+
+        try:
+            for i, (to_email, name, company) in enumerate(recipients):
+                try:
+                    fields = {'name': name, 'company': company}
+                    server.send_message(self._build_email(to_email, fields, template))
+                    logging.info(f"Email sent to {to_email}")
+                    results[i] = True
+                except Exception as e:
+                    logging.error(f"Error sending email to {to_email}: {str(e)}")
+        finally:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                pass
+        return results
 
     def send_sms(self, lead_id: str, message: str) -> bool:
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
-            lead = cursor.fetchone()
+            lead = self.db_conn.execute(_SQL_SELECT_LEAD_PHONE, (lead_id,)).fetchone()
             
             if not lead:
                 logging.error(f"Lead {lead_id} not found")
                 return False
 
-            # Assuming the phone number is stored in the database
-            # You might need to adjust this based on your database schema
-            phone_number = lead[5]  # Adjust the index as needed
+            return self._send_sms_to(lead_id, lead['phone'], message)
+        except Exception as e:
+            logging.error(f"Failed to send SMS to lead {lead_id}: {str(e)}")
+            return False
+
+    def _send_sms_to(self, lead_id: str, phone_number: Optional[str], message: str) -> bool:
+        # Only talks to Twilio, so it is safe to run from the SMS worker pool
+        if not phone_number:
+            logging.error(f"Lead {lead_id} has no phone number")
+            return False
 
+        try:
             message = self.twilio_client.messages.create(
                 body=message,
                 from_=self.config['twilio_phone_number'],
@@ -346,41 +608,37 @@ class LeadGenerationAgent:
             return False
 
     def generate_detailed_report(self) -> Dict:
+        # total_changes only moves when this connection writes, so an unchanged
+        # counter means the cached report is still current
+        # Callers get a deep copy so annotating a report can't corrupt the cached one
+        changes, report = self._report_cache
+        if changes == self.db_conn.total_changes:
+            return copy.deepcopy(report)
+
         try:
-            cursor = self.db_conn.cursor()
-            
-            # Get basic stats
-            cursor.execute("SELECT COUNT(*) FROM leads")
-            total_leads = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM contact_attempts")
-            total_contacts = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM leads WHERE qualification = 'Priority Lead'")
-            qualified_leads = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM leads WHERE qualification = 'Disqualified'")
-            disqualified_leads = cursor.fetchone()[0]
-            
-            # Get lead scores distribution
-            cursor.execute("SELECT score FROM leads WHERE score IS NOT NULL")
-            scores = [row[0] for row in cursor.fetchall()]
+            # Get basic stats, score distribution and contact counts in one round-trip
+            summary = self.db_conn.execute(_SQL_REPORT_SUMMARY).fetchone()
+            total_leads = summary['total_leads']
+            total_contacts = summary['total_contacts']
+            qualified_leads = summary['qualified_leads']
+            disqualified_leads = summary['disqualified_leads']
+
+            # MIN/MAX/AVG skip NULL scores and return NULL when nothing is scored
             score_distribution = {
-                'min': min(scores) if scores else 0,
-                'max': max(scores) if scores else 0,
-                'average': sum(scores) / len(scores) if scores else 0
+                'min': summary['min_score'] or 0,
+                'max': summary['max_score'] or 0,
+                'average': summary['average_score'] or 0
             }
             
             # Get qualification distribution
-            cursor.execute("SELECT qualification, COUNT(*) FROM leads GROUP BY qualification")
-            qualification_distribution = dict(cursor.fetchall())
+            qualification_distribution = dict(
+                self.db_conn.execute("SELECT qualification, COUNT(*) FROM leads GROUP BY qualification").fetchall()
+            )
             
             # Get contact attempt success rate
-            cursor.execute("SELECT COUNT(*) FROM contact_attempts WHERE result = 'success'")
-            successful_attempts = cursor.fetchone()[0]
-            success_rate = successful_attempts / total_contacts if total_contacts > 0 else 0
+            success_rate = summary['successful_attempts'] / total_contacts if total_contacts > 0 else 0
             
-            return {
+            report = {
                 'total_leads': total_leads,
                 'total_contacts': total_contacts,
                 'qualified_leads': qualified_leads,
@@ -389,25 +647,34 @@ class LeadGenerationAgent:
                 'qualification_distribution': qualification_distribution,
                 'contact_success_rate': success_rate
             }
+            self._report_cache = (self.db_conn.total_changes, report)
+            return copy.deepcopy(report)
         except Exception as e:
             logging.error(f"Error generating report: {str(e)}")
             return {}
 
     def visualize_report(self, report: Dict):
         try:
-            # Pie chart for qualification distribution
-            plt.figure(figsize=(10, 5))
-            plt.pie(report['qualification_distribution'].values(), labels=report['qualification_distribution'].keys(), autopct='%1.1f%%')
-            plt.title('Lead Qualification Distribution')
-            plt.savefig('qualification_distribution.png')
-            plt.close()
-
-            # Bar chart for score distribution
-            plt.figure(figsize=(10, 5))
-            plt.bar(['Min Score', 'Max Score', 'Average Score'], [report['score_distribution']['min'], report['score_distribution']['max'], report['score_distribution']['average']])
-            plt.title('Lead Score Distribution')
-            plt.savefig('score_distribution.png')
-            plt.close()
+            # Imported here so non-visualization paths never pay for matplotlib start-up;
+            # Agg renders straight to files without probing for a GUI backend
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+
+            fig, ax = plt.subplots(figsize=(10, 5))
+            try:
+                # Pie chart for qualification distribution
+                ax.pie(report['qualification_distribution'].values(), labels=report['qualification_distribution'].keys(), autopct='%1.1f%%')
+                ax.set_title('Lead Qualification Distribution')
+                fig.savefig('qualification_distribution.png')
+
+                # Bar chart for score distribution, reusing the same figure
+                ax.clear()
+                ax.bar(['Min Score', 'Max Score', 'Average Score'], [report['score_distribution']['min'], report['score_distribution']['max'], report['score_distribution']['average']])
+                ax.set_title('Lead Score Distribution')
+                fig.savefig('score_distribution.png')
+            finally:
+                plt.close(fig)
 
             logging.info("Report visualizations saved as PNG files.")
         except Exception as e:
@@ -420,56 +687,80 @@ class LeadGenerationAgent:
 # CLI interface
 def cli():
     agent = LeadGenerationAgent()
-    while True:
-        print("\n1. Generate Lead")
-        print("2. Qualify Lead")
-        print("3. Send Outbound Contact")
-        print("4. Process EOI")
-        print("5. Transfer Lead")
-        print("6. Generate Report")
-        print("7. Exit")
+    pending_leads = []
+
+    def flush_pending_leads():
+        if pending_leads:
+            for lead_id in agent.generate_leads_bulk(pending_leads):
+                print(f"Lead generated with ID: {lead_id}")
+            pending_leads.clear()
+
+    try:
+        while True:
+            print("\n1. Generate Lead")
+            print("2. Qualify Lead")
+            print("3. Send Outbound Contact")
+            print("4. Process EOI")
+            print("5. Transfer Lead")
+            print("6. Generate Report")
+            print("7. Exit")
         
-        choice = input("Enter your choice: ")
-        
-        if choice == '1':
-            name = input("Enter lead name: ")
-            email = input("Enter lead email: ")
-            company = input("Enter lead company: ")
-            lead_id = agent.generate_lead({"name": name, "email": email, "company": company})
-            print(f"Lead generated with ID: {lead_id}")
-        elif choice == '2':
-            lead_id = input("Enter lead ID: ")
-            budget = input("Has budget? (y/n): ").lower() == 'y'
-            authority = input("Has authority? (y/n): ").lower() == 'y'
-            need = input("Has need? (y/n): ").lower() == 'y'
-            timeline = input("Has timeline? (y/n): ").lower() == 'y'
-            qualification = agent.qualify_lead(lead_id, {"budget": budget, "authority": authority, "need": need, "timeline": timeline})
-            print(f"Lead qualified as: {qualification}")
-        elif choice == '3':
-            lead_id = input("Enter lead ID: ")
-            channel = input("Enter channel (email/sms): ")
-            success = agent.outbound_contact(lead_id, channel)
-            print("Contact successful" if success else "Contact failed")
-        elif choice == '4':
-            lead_id = input("Enter lead ID: ")
-            product_interest = input("Enter product interest: ")
-            budget_range = input("Enter budget range: ")
-            success = agent.process_eoi(lead_id, {"product_interest": product_interest, "budget_range": budget_range})
-            print("EOI processed successfully" if success else "EOI processing failed")
-        elif choice == '5':
-            lead_id = input("Enter lead ID: ")
-            sales_team_available = input("Is sales team available? (y/n): ").lower() == 'y'
-            status = agent.transfer_lead(lead_id, sales_team_available)
-            print(f"Transfer status: {status}")
-        elif choice == '6':
-            report = agent.generate_detailed_report()
-            print(json.dumps(report, indent=2))
-            agent.visualize_report(report)
-            print("Report visualizations saved as PNG files.")
-        elif choice == '7':
-            break
-        else:
-            print("Invalid choice. Please try again.")
+            choice = input("Enter your choice: ")
+
+            # Buffered leads must be written before any other option reads the table
+            if choice != '1':
+                flush_pending_leads()
+
+            if choice == '1':
+                name = input("Enter lead name: ")
+                email = input("Enter lead email: ")
+                company = input("Enter lead company: ")
+                phone = input("Enter lead phone (optional): ")
+                pending_leads.append({"name": name, "email": email, "company": company, "phone": phone or None})
+                if len(pending_leads) >= CLI_LEAD_BUFFER_SIZE:
+                    flush_pending_leads()
+                else:
+                    print(f"Lead queued ({len(pending_leads)} pending)")
+            elif choice == '2':
+                lead_id = input("Enter lead ID: ")
+                budget = input("Has budget? (y/n): ").lower() == 'y'
+                authority = input("Has authority? (y/n): ").lower() == 'y'
+                need = input("Has need? (y/n): ").lower() == 'y'
+                timeline = input("Has timeline? (y/n): ").lower() == 'y'
+                qualification = agent.qualify_lead(lead_id, {"budget": budget, "authority": authority, "need": need, "timeline": timeline})
+                print(f"Lead qualified as: {qualification}")
+            elif choice == '3':
+                lead_id = input("Enter lead ID: ")
+                channel = input("Enter channel (email/sms): ")
+                success = agent.outbound_contact(lead_id, channel)
+                print("Contact successful" if success else "Contact failed")
+            elif choice == '4':
+                lead_id = input("Enter lead ID: ")
+                product_interest = input("Enter product interest: ")
+                budget_range = input("Enter budget range: ")
+                success = agent.process_eoi(lead_id, {"product_interest": product_interest, "budget_range": budget_range})
+                print("EOI processed successfully" if success else "EOI processing failed")
+            elif choice == '5':
+                lead_id = input("Enter lead ID: ")
+                sales_team_available = input("Is sales team available? (y/n): ").lower() == 'y'
+                status = agent.transfer_lead(lead_id, sales_team_available)
+                print(f"Transfer status: {status}")
+            elif choice == '6':
+                report = agent.generate_detailed_report()
+                print(json.dumps(report, indent=2))
+                agent.visualize_report(report)
+                print("Report visualizations saved as PNG files.")
+            elif choice == '7':
+                break
+            else:
+                print("Invalid choice. Please try again.")
+    except (EOFError, KeyboardInterrupt):
+        print()
+    finally:
+        # Leads typed in but not yet written must survive Ctrl-C/EOF as well as option 7
+        if pending_leads:
+            print(f"Saving {len(pending_leads)} pending lead(s) before exit")
+        flush_pending_leads()
 
 if __name__ == "__main__":
     cli()
\ No newline at end of file
@@ -1,7 +1,10 @@
 import unittest
+from unittest import mock
 from lead_generation_agent import LeadGenerationAgent
 import os
 import json
+import tempfile
+import sqlite3
 
 class TestLeadGenerationAgent(unittest.TestCase):
     @classmethod
@@ -29,6 +32,10 @@ class TestLeadGenerationAgent(unittest.TestCase):
         # Remove the test configuration file and database
         os.remove('test_config.json')
         os.remove(cls.test_config['database_file'])
+        # WAL mode keeps sidecar files next to the database until the last connection closes
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(cls.test_config['database_file'] + suffix):
+                os.remove(cls.test_config['database_file'] + suffix)
 
     def setUp(self):
         self.agent = LeadGenerationAgent('test_config.json')
@@ -38,17 +45,141 @@ class TestLeadGenerationAgent(unittest.TestCase):
         self.assertIsNotNone(lead_id)
         self.assertTrue(lead_id.startswith("LEAD_"))
 
+    def test_generate_leads_bulk(self):
+        lead_ids = self.agent.generate_leads_bulk([
+            {"name": "Bulk User 1", "email": "bulk1@example.com", "company": "Bulk Corp 1"},
+            {"name": "Bulk User 2", "email": "bulk2@example.com", "company": "Bulk Corp 2"}
+        ])
+        self.assertEqual(len(lead_ids), 2)
+        self.assertEqual(len(set(lead_ids)), 2)
+        self.assertTrue(all(lead_id.startswith("LEAD_") for lead_id in lead_ids))
+
+    def test_generate_leads_bulk_rolls_back_on_failure(self):
+        count_leads = "SELECT COUNT(*) FROM leads"
+        before = self.agent.db_conn.execute(count_leads).fetchone()[0]
+        # Duplicate IDs make the second INSERT fail after the first has been written
+        with mock.patch.object(self.agent, '_new_lead_id', return_value="LEAD_DUPLICATE"):
+            with self.assertRaises(sqlite3.IntegrityError):
+                self.agent.generate_leads_bulk([
+                    {"name": "Dup User 1", "email": "dup1@example.com", "company": "Dup Corp 1"},
+                    {"name": "Dup User 2", "email": "dup2@example.com", "company": "Dup Corp 2"}
+                ])
+        self.assertFalse(self.agent.db_conn.in_transaction)
+        self.assertEqual(self.agent.db_conn.execute(count_leads).fetchone()[0], before)
+        # The connection is usable for the next transaction
+        self.agent.generate_lead({"name": "After User", "email": "after@example.com", "company": "After Corp"})
+
     def test_qualify_lead(self):
         lead_id = self.agent.generate_lead({"name": "Test User", "email": "test@example.com", "company": "Test Corp"})
         qualification = self.agent.qualify_lead(lead_id, {"budget": True, "authority": True, "need": True, "timeline": True})
         self.assertEqual(qualification, "Priority Lead")
 
+    def test_qualify_leads(self):
+        lead_ids = self.agent.generate_leads_bulk([
+            {"name": "Qualify User 1", "email": "qualify1@example.com", "company": "Qualify Corp 1"},
+            {"name": "Qualify User 2", "email": "qualify2@example.com", "company": "Qualify Corp 2"}
+        ])
+        results = self.agent.qualify_leads({
+            lead_ids[0]: {"budget": True, "authority": True, "need": False, "timeline": False},
+            lead_ids[1]: {"budget": True, "authority": False, "need": False, "timeline": False},
+            "LEAD_MISSING": {"budget": True, "authority": True, "need": True, "timeline": True}
+        })
+        self.assertEqual(results[lead_ids[0]], "Nurture Queue")
+        self.assertEqual(results[lead_ids[1]], "Research Queue")
+        self.assertEqual(results["LEAD_MISSING"], "Not Found")
+
     def test_score_lead(self):
         lead_id = self.agent.generate_lead({"name": "Test User", "email": "test@example.com", "company": "Test Corp"})
         score = self.agent.score_lead(lead_id)
         self.assertIsInstance(score, int)
         self.assertTrue(0 <= score <= 100)
 
+    def test_score_leads(self):
+        lead_ids = self.agent.generate_leads_bulk([
+            {"name": f"Score User {i}", "email": f"score{i}@example.com", "company": f"Score Corp {i}"}
+            for i in range(10)
+        ])
+        # Both classes must be present for the model to train, so retrain after qualifying
+        self.agent.qualify_leads({
+            lead_id: {"budget": i % 2 == 0, "authority": i % 2 == 0, "need": i % 2 == 0, "timeline": i % 2 == 0}
+            for i, lead_id in enumerate(lead_ids)
+        })
+        self.agent.lead_scoring_model = self.agent.train_lead_scoring_model()
+        self.assertIsNotNone(self.agent.lead_scoring_model)
+
+        scores = self.agent.score_leads(lead_ids + ["LEAD_MISSING"])
+        self.assertEqual(set(scores), set(lead_ids))
+        for score in scores.values():
+            self.assertIsInstance(score, int)
+            self.assertTrue(0 <= score <= 100)
+
+    def test_send_sms_uses_stored_phone(self):
+        with_phone, without_phone = self.agent.generate_leads_bulk([
+            {"name": "Sms User 3", "email": "sms3@example.com", "company": "Sms Corp 3", "phone": "+15550101"},
+            {"name": "Sms User 4", "email": "sms4@example.com", "company": "Sms Corp 4"}
+        ])
+        self.agent._twilio = mock.Mock()
+        self.assertTrue(self.agent.send_sms(with_phone, "Hello"))
+        self.assertEqual(self.agent._twilio.messages.create.call_args.kwargs['to'], "+15550101")
+        self.agent._twilio.messages.create.reset_mock()
+        self.assertFalse(self.agent.send_sms(without_phone, "Hello"))
+        self.agent._twilio.messages.create.assert_not_called()
+
+    def test_initialize_database_adds_phone_column(self):
+        with tempfile.TemporaryDirectory() as db_dir:
+            db_file = os.path.join(db_dir, 'old_leads.db')
+            old_conn = sqlite3.connect(db_file)
+            old_conn.execute(
+                "CREATE TABLE leads (id TEXT PRIMARY KEY, name TEXT, email TEXT, company TEXT, "
+                "qualification TEXT, created_at TEXT, score INTEGER)"
+            )
+            old_conn.execute("INSERT INTO leads (id, name) VALUES ('LEAD_OLD', 'Old User')")
+            old_conn.commit()
+            old_conn.close()
+
+            self.agent.config['database_file'] = db_file
+            conn = self.agent.initialize_database()
+            try:
+                columns = {row['name'] for row in conn.execute("PRAGMA table_info(leads)")}
+                self.assertIn('phone', columns)
+                self.assertIsNone(conn.execute("SELECT phone FROM leads WHERE id = 'LEAD_OLD'").fetchone()['phone'])
+            finally:
+                conn.close()
+
+    def test_outbound_contact_batch_sms_skips_missing_phone(self):
+        with_phone, without_phone = self.agent.generate_leads_bulk([
+            {"name": "Sms User 1", "email": "sms1@example.com", "company": "Sms Corp 1", "phone": "+15550100"},
+            {"name": "Sms User 2", "email": "sms2@example.com", "company": "Sms Corp 2"}
+        ])
+        self.agent._twilio = mock.Mock()
+        results = self.agent.outbound_contact_batch([with_phone, without_phone], 'sms')
+        self.assertEqual(results, {with_phone: True, without_phone: False})
+        self.agent._twilio.messages.create.assert_called_once()
+        self.assertEqual(self.agent._twilio.messages.create.call_args.kwargs['to'], "+15550100")
+
+    def test_outbound_contact_batch_records_failure_when_twilio_unavailable(self):
+        batch_lead, single_lead = self.agent.generate_leads_bulk([
+            {"name": "Sms User 5", "email": "sms5@example.com", "company": "Sms Corp 5", "phone": "+15550102"},
+            {"name": "Sms User 6", "email": "sms6@example.com", "company": "Sms Corp 6", "phone": "+15550103"}
+        ])
+        client = mock.PropertyMock(side_effect=RuntimeError("bad credentials"))
+        with mock.patch.object(LeadGenerationAgent, 'twilio_client', client):
+            self.assertEqual(self.agent.outbound_contact_batch([batch_lead], 'sms'), {batch_lead: False})
+            self.assertFalse(self.agent.outbound_contact(single_lead, 'sms'))
+
+        attempts = dict(self.agent.db_conn.execute(
+            "SELECT lead_id, result FROM contact_attempts WHERE lead_id IN (?, ?)", (batch_lead, single_lead)
+        ).fetchall())
+        self.assertEqual(attempts, {batch_lead: 'failure', single_lead: 'failure'})
+
+    def test_load_email_templates_rejects_unknown_placeholder(self):
+        with tempfile.TemporaryDirectory() as template_dir:
+            with open(os.path.join(template_dir, 'bad.txt'), 'w') as f:
+                f.write("Dear {name}, about {product}")
+            self.agent.config['email_template_directory'] = template_dir
+            with self.assertRaises(ValueError):
+                self.agent.load_email_templates()
+
     def test_generate_report(self):
         self.agent.generate_lead({"name": "Test User 1", "email": "test1@example.com", "company": "Test Corp 1"})
         self.agent.generate_lead({"name": "Test User 2", "email": "test2@example.com", "company": "Test Corp 2"})
@@ -58,5 +189,18 @@ class TestLeadGenerationAgent(unittest.TestCase):
         self.assertIn('qualification_distribution', report)
         self.assertIn('contact_success_rate', report)
 
+    def test_generate_report_refreshes_after_write(self):
+        report = self.agent.generate_detailed_report()
+        self.assertEqual(self.agent.generate_detailed_report(), report)
+        # Mutating a returned report must not leak into later cached results
+        report['score_distribution']['min'] = -1
+        report['qualification_distribution']['Annotated'] = 1
+        cached = self.agent.generate_detailed_report()
+        self.assertNotEqual(cached['score_distribution']['min'], -1)
+        self.assertNotIn('Annotated', cached['qualification_distribution'])
+        self.agent.generate_lead({"name": "Test User 3", "email": "test3@example.com", "company": "Test Corp 3"})
+        refreshed = self.agent.generate_detailed_report()
+        self.assertEqual(refreshed['total_leads'], report['total_leads'] + 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file